@@ -9,62 +9,63 @@ from hole import Hole
 API_TOKEN = "YOUR_API_TOKEN"
 
 
-async def main():
+async def main(session):
     """Get the data from a *hole instance."""
-    async with aiohttp.ClientSession() as session:
-        data = Hole("192.168.0.215", session)
-
-        await data.get_versions()
-        print(json.dumps(data.versions, indent=4, sort_keys=True))
-        print(
-            "Version:",
-            data.core_current,
-            "Latest:",
-            data.core_latest,
-            "Update available:",
-            data.core_update,
-        )
-        print(
-            "FTL:",
-            data.ftl_current,
-            "Latest:",
-            data.ftl_latest,
-            "Update available:",
-            data.ftl_update,
-        )
-        print(
-            "Web:",
-            data.web_current,
-            "Latest:",
-            data.web_latest,
-            "Update available:",
-            data.web_update,
-        )
-
-        await data.get_data()
-
-        # Get the raw data
-        print(json.dumps(data.data, indent=4, sort_keys=True))
-
-        print("Status:", data.status)
-        print("Domains being blocked:", data.domains_being_blocked)
-
-
-async def disable():
-    """Get the data from a *hole instance."""
-    async with aiohttp.ClientSession() as session:
-        data = Hole("192.168.0.215", session, api_token=API_TOKEN)
-        await data.disable()
+    data = Hole("192.168.0.215", session)
 
+    await data.refresh()
+    print(json.dumps(data.versions, indent=4, sort_keys=True))
+    print(
+        "Version:",
+        data.core_current,
+        "Latest:",
+        data.core_latest,
+        "Update available:",
+        data.core_update,
+    )
+    print(
+        "FTL:",
+        data.ftl_current,
+        "Latest:",
+        data.ftl_latest,
+        "Update available:",
+        data.ftl_update,
+    )
+    print(
+        "Web:",
+        data.web_current,
+        "Latest:",
+        data.web_latest,
+        "Update available:",
+        data.web_update,
+    )
 
-async def enable():
-    """Get the data from a *hole instance."""
+    # Get the raw data
+    print(json.dumps(data.data, indent=4, sort_keys=True))
+
+    print("Status:", data.status)
+    print("Domains being blocked:", data.domains_being_blocked)
+
+
+async def disable(session):
+    """Disable DNS blocking on a *hole instance."""
+    data = Hole("192.168.0.215", session, api_token=API_TOKEN)
+    await data.disable()
+
+
+async def enable(session):
+    """Enable DNS blocking on a *hole instance."""
+    data = Hole("192.168.0.215", session, api_token=API_TOKEN)
+    await data.enable()
+
+
+async def run_all():
+    """Run all examples with one shared session."""
     async with aiohttp.ClientSession() as session:
-        data = Hole("192.168.0.215", session, api_token=API_TOKEN)
-        await data.enable()
+        await main(session)
+        await disable(session)
+        await enable(session)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
-    asyncio.run(disable())
-    asyncio.run(enable())
+    asyncio.run(run_all())
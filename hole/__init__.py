@@ -1,31 +1,82 @@
 """*hole API Python client."""
 import asyncio
+import json
 import logging
 import socket
+import sys
+import time
 
 import aiohttp
-import async_timeout
+import yarl
 
 from . import exceptions
 
+if sys.version_info >= (3, 11):
+    from asyncio import timeout
+else:
+    from async_timeout import timeout
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 _LOGGER = logging.getLogger(__name__)
+_JSON_LOADS = orjson.loads if orjson is not None else json.loads
 _INSTANCE = "{schema}://{host}/{location}/api.php"
+_TIMEOUT = aiohttp.ClientTimeout(total=5)
+_VERSIONS_TTL = 3600
+_PARAMS_VERSIONS = {"versions": ""}
 
 
 class Hole(object):
     """A class for handling connections with a *hole instance."""
 
+    __slots__ = (
+        "_session",
+        "_connector",
+        "_owns_session",
+        "tls",
+        "verify_tls",
+        "schema",
+        "host",
+        "location",
+        "_api_token",
+        "_auth_params",
+        "_params_summary",
+        "_params_status",
+        "_params_enable",
+        "data",
+        "versions",
+        "_versions_expiry",
+        "base_url",
+    )
+
     def __init__(
         self,
         host,
-        session,
+        session=None,
         location="admin",
         tls=False,
         verify_tls=True,
         api_token=None,
+        connector=None,
     ):
-        """Initialize the connection to a *hole instance."""
+        """Initialize the connection to a *hole instance.
+
+        If no session is given, one is created on first use and should be
+        closed with ``close()``. It uses the given connector, which is left
+        open for the caller, or a keep-alive connector of its own. The
+        session (and its connector) should live as long as the instance so
+        that connections and resolved addresses are reused across polls.
+        ``verify_tls`` only applies to the connector created by ``Hole``, a
+        session or connector given by the caller keeps its own TLS settings.
+        """
+        if session is not None and connector is not None:
+            raise ValueError("Only one of session and connector can be given")
         self._session = session
+        self._connector = connector
+        self._owns_session = False
         self.tls = tls
         self.verify_tls = verify_tls
         self.schema = "https" if self.tls else "http"
@@ -34,89 +85,155 @@ class Hole(object):
         self.api_token = api_token
         self.data = {}
         self.versions = {}
-        self.base_url = _INSTANCE.format(
-            schema=self.schema, host=self.host, location=self.location
+        self._versions_expiry = 0.0
+        self.base_url = yarl.URL(
+            _INSTANCE.format(schema=self.schema, host=self.host, location=self.location)
         )
 
-    async def get_data(self):
-        """Get details of a *hole instance."""
-        params = "summaryRaw&auth={}".format(self.api_token)
+    @property
+    def api_token(self):
+        """Return the API token used for the *hole instance."""
+        return self._api_token
+
+    @api_token.setter
+    def api_token(self, api_token):
+        """Set the API token and rebuild the queries which contain it."""
+        self._api_token = api_token
+        self._auth_params = {} if api_token is None else {"auth": api_token}
+        self._params_summary = {"summaryRaw": "", **self._auth_params}
+        self._params_status = {"status": "", **self._auth_params}
+        self._params_enable = {"enable": "True", **self._auth_params}
+
+    def _get_session(self):
+        """Return the session, create one with a keep-alive connector if needed."""
+        if self._session is None:
+            connector = self._connector or aiohttp.TCPConnector(
+                limit_per_host=4,
+                keepalive_timeout=75,
+                use_dns_cache=True,
+                ttl_dns_cache=3600,
+                ssl=self.verify_tls,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector, connector_owner=self._connector is None
+            )
+            self._owns_session = True
+        return self._session
+
+    async def close(self):
+        """Close the session if it was created by this instance."""
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+            self._owns_session = False
+
+    async def __aenter__(self):
+        """Set up the session when used as an async context manager."""
+        self._get_session()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        """Close the session if it was created by this instance."""
+        await self.close()
+
+    async def _request(self, params):
+        """Send a request to a *hole instance and return the decoded response."""
         try:
-            async with async_timeout.timeout(5):
-                response = await self._session.get(self.base_url, params=params)
-
+            response = await self._get_session().get(
+                self.base_url, params=params, timeout=_TIMEOUT
+            )
             _LOGGER.debug("Response from *hole: %s", response.status)
-            self.data = await response.json()
-            _LOGGER.debug(self.data)
-
-        except (asyncio.TimeoutError, aiohttp.ClientError, socket.gaierror):
+            if response.status != 200:
+                await response.release()
+                msg = "Unexpected response from *hole: {} ({})".format(
+                    self.host, response.status
+                )
+                _LOGGER.error(msg)
+                raise exceptions.HoleConnectionError(msg)
+
+            return _JSON_LOADS(await response.read())
+
+        except (
+            asyncio.TimeoutError,
+            aiohttp.ClientError,
+            socket.gaierror,
+            ValueError,
+        ):
             msg = "Can not load data from *hole: {}".format(self.host)
             _LOGGER.error(msg)
             raise exceptions.HoleConnectionError(msg)
 
-    async def get_versions(self):
-        """Get version information of a *hole instance."""
-        params = "versions"
-        try:
-            async with async_timeout.timeout(5):
-                response = await self._session.get(self.base_url, params=params)
+    def _update_status(self, response):
+        """Store the status if a response of a *hole instance contains one."""
+        if isinstance(response, dict) and "status" in response:
+            self.data["status"] = response["status"]
 
-            _LOGGER.debug("Response from *hole: %s", response.status)
-            self.versions = await response.json()
-            _LOGGER.debug(self.versions)
+    async def _wait_for_status(self, status, response):
+        """Wait until a *hole instance reports the given status.
 
-        except (asyncio.TimeoutError, aiohttp.ClientError, socket.gaierror):
+        The response of the enable/disable call already contains the new
+        status, polling is only needed if it does not. Only the status is
+        requested then, with an increasing delay between the attempts.
+        """
+        self._update_status(response)
+        delay = 0.1
+        try:
+            async with timeout(5):
+                while self.data.get("status") != status:
+                    _LOGGER.debug("Awaiting status to be %s", status)
+                    await asyncio.sleep(delay)
+                    delay *= 2
+                    self._update_status(await self._request(self._params_status))
+
+        except asyncio.TimeoutError:
             msg = "Can not load data from *hole: {}".format(self.host)
             _LOGGER.error(msg)
             raise exceptions.HoleConnectionError(msg)
 
+        _LOGGER.debug("Status of *hole: %s", status)
+
+    async def get_data(self):
+        """Get details of a *hole instance."""
+        self.data = await self._request(self._params_summary)
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug("Data from *hole: %s", self.data)
+
+    async def get_versions(self):
+        """Get version information of a *hole instance."""
+        self.versions = await self._request(_PARAMS_VERSIONS)
+        self._versions_expiry = time.monotonic() + _VERSIONS_TTL
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug("Versions from *hole: %s", self.versions)
+
+    async def refresh(self):
+        """Get details and version information of a *hole instance at once.
+
+        The version information only changes with an update of the instance
+        and is therefore only requested again after an hour.
+        """
+        requests = [self.get_data()]
+        if time.monotonic() >= self._versions_expiry:
+            requests.append(self.get_versions())
+        results = await asyncio.gather(*requests, return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
     async def enable(self):
         """Enable DNS blocking on a *hole instance."""
         if self.api_token is None:
             _LOGGER.error("You need to supply an api_token to use this")
             return
-        params = "enable=True&auth={}".format(self.api_token)
-        try:
-            async with async_timeout.timeout(5):
-                response = await self._session.get(self.base_url, params=params)
-                _LOGGER.debug("Response from *hole: %s", response.status)
-
-                while self.status != "enabled":
-                    _LOGGER.debug("Awaiting status to be enabled")
-                    await self.get_data()
-                    await asyncio.sleep(0.01)
-
-            data = self.status
-            _LOGGER.debug(data)
-
-        except (asyncio.TimeoutError, aiohttp.ClientError, socket.gaierror):
-            msg = "Can not load data from *hole: {}".format(self.host)
-            _LOGGER.error(msg)
-            raise exceptions.HoleConnectionError(msg)
+        response = await self._request(self._params_enable)
+        await self._wait_for_status("enabled", response)
 
     async def disable(self, duration=True):
         """Disable DNS blocking on a *hole instance."""
         if self.api_token is None:
             _LOGGER.error("You need to supply an api_token to use this")
             return
-        params = "disable={}&auth={}".format(duration, self.api_token)
-        try:
-            async with async_timeout.timeout(5):
-                response = await self._session.get(self.base_url, params=params)
-                _LOGGER.debug("Response from *hole: %s", response.status)
-
-                while self.status != "disabled":
-                    _LOGGER.debug("Awaiting status to be disabled")
-                    await self.get_data()
-                    await asyncio.sleep(0.01)
-
-            data = self.status
-            _LOGGER.debug(data)
-
-        except (asyncio.TimeoutError, aiohttp.ClientError, socket.gaierror):
-            msg = "Can not load data from *hole: {}".format(self.host)
-            _LOGGER.error(msg)
-            raise exceptions.HoleConnectionError(msg)
+        response = await self._request({"disable": str(duration), **self._auth_params})
+        await self._wait_for_status("disabled", response)
 
     @property
     def status(self):
@@ -212,3 +329,30 @@ class Hole(object):
     def web_update(self):
         """Return wether an update of web interface of the *hole instance is available."""
         return self.versions["web_update"]
+
+
+async def poll_many(hosts, session, concurrency=16, **kwargs):
+    """Get details of several *hole instances concurrently.
+
+    Additional keyword arguments are passed on to ``Hole``. If one of the
+    instances fails, the remaining requests are cancelled and the error is
+    raised. The session is shared by all instances and must be given.
+    """
+    if session is None:
+        raise ValueError("A session is required to poll several instances")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def poll(host):
+        async with semaphore:
+            instance = Hole(host, session, **kwargs)
+            await instance.get_data()
+            return instance
+
+    tasks = [asyncio.ensure_future(poll(host)) for host in hosts]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
@@ -21,8 +21,12 @@ setup(
     license="MIT",
     install_requires=[
         "aiohttp<4",
-        "async_timeout>4,<5",
+        "async_timeout>4,<5; python_version<'3.11'",
+        "yarl",
     ],
+    extras_require={
+        "speedups": ["orjson"],
+    },
     packages=["hole"],
     python_requires=">=3.9",
     zip_safe=True,